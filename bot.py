@@ -1,4 +1,7 @@
 import asyncio
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import ApplicationBuilder, CallbackQueryHandler, CommandHandler, ContextTypes, MessageHandler, filters, PollAnswerHandler
 
@@ -6,7 +9,15 @@ from core.telegram_client import TelegramClient
 from core.game_manager import GameManager
 from core.player_manager import PlayerManager
 from core.prompt_manager import PromptManager
-from config import BOT_KEY, MAX_PLAYERS, ROUND_COUNT
+from core.update_processor import GroupUpdateProcessor
+from config import BOT_KEY, LOG_LEVEL, MAX_PLAYERS, ROUND_COUNT, POLLING_TIMEOUT
+
+try:
+    import uvloop
+except ImportError:  # uvloop isn't available on Windows
+    uvloop = None
+
+logger = logging.getLogger(__name__)
 
 # --- Managers ---
 telegram_client = TelegramClient(token=BOT_KEY)
@@ -64,7 +75,7 @@ async def start_game(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Lock further joins
     game.locked = True
 
-    player_names = ", ".join([p.username or 'No-Name' for p in game.players.values()])
+    player_names = ", ".join([p.username or 'No-Name' for p in game.players_list])
     await telegram_client.send_message_to_group(
         group_id,
         f"🎬 Game starting with {len(game.players)} players: {player_names}\nPrepare for Round {game.round + 1}!"
@@ -76,7 +87,7 @@ async def next_round(update: Update, context: ContextTypes.DEFAULT_TYPE):
     group_id = update.effective_chat.id
     game = game_manager.get_game(group_id)
 
-    player_names = ", ".join([p.username for p in game.players.values()])
+    player_names = ", ".join([p.username for p in game.players_list])
     await telegram_client.send_message_to_group(
         group_id,
         f"🎬 Game starting with {len(game.players)} players: {player_names}\nPrepare for Round {game.round}!"
@@ -105,8 +116,15 @@ async def join_game(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await telegram_client.send_message_to_group(group_id, "The lobby is full!")
         return
 
+    # Prompt replies are routed by user, so a player can only be in one game at a time
+    other_game = game_manager.user_to_game.get(user.id)
+    if other_game is not None and other_game is not game:
+        await telegram_client.send_message_to_group(group_id, "You’re already in a game in another group!")
+        return
+
     added = PlayerManager.add_player(game, user.id, user.username)
     if added:
+        game_manager.user_to_game[user.id] = game
         try:
             # Attempt to DM the new player
             await telegram_client.send_message_to_person(
@@ -142,34 +160,46 @@ async def handle_dm(update: Update, context: ContextTypes.DEFAULT_TYPE):
     message_id = reply_to.message_id
 
     # find game for this player
-    for game in game_manager.active_games.values():
-        if user_id in game.players:
-            # check if this message_id maps to a prompt
-            prompt_idx = game.prompt_messages.get(user_id, {}).get(message_id)
-            if prompt_idx is None:
-                await update.message.reply_text("That message isn't a valid prompt")
-                return
-
-            # store the answer
-            game.pending_answers[user_id][prompt_idx] = text
-            await update.message.reply_text("✅ Answer has been recorded")
-            break
+    game = game_manager.user_to_game.get(user_id)
+    if not game:
+        return
+
+    # check if this message_id maps to a prompt
+    prompt_idx = game.prompt_messages.get(user_id, {}).get(message_id)
+    if prompt_idx is None:
+        await update.message.reply_text("That message isn't a valid prompt")
+        return
+
+    # store the answer
+    game.pending_answers[user_id][prompt_idx] = text
+    await update.message.reply_text("✅ Answer has been recorded")
 
 async def handle_poll_answer(update, context):
     poll_answer = update.poll_answer
     user_id = poll_answer.user.id
     poll_id = poll_answer.poll_id
-    choice = poll_answer.option_ids[0]
 
-    for game in game_manager.active_games.values():
-        if poll_id in game.votes:
-            game.votes[poll_id][user_id] = choice
-            print(f"Vote registered: user {user_id} -> option {choice} for poll {poll_id}")
+    game = game_manager.poll_to_game.get(poll_id)
+    if not game:
+        return
+
+    # Ignore polls from an earlier round that are still open in the group
+    votes = game.votes.get(poll_id)
+    if votes is None:
+        return
+
+    # An empty option list means the voter retracted their vote
+    if not poll_answer.option_ids:
+        votes.pop(user_id, None)
+        return
 
-            # Once all players vote, calculate and update scores
-            if len(game.votes[poll_id]) >= len(game.players):
-                await game_manager.calculate_poll_score(game, poll_id)
-            break
+    choice = poll_answer.option_ids[0]
+    votes[user_id] = choice
+    logger.debug("Vote registered: user %s -> option %s for poll %s", user_id, choice, poll_id)
+
+    # Once all players vote, wake up the versus phase, which scores the polls
+    if len(votes) >= len(game.players):
+        game.poll_complete[poll_id].set()
 
 async def end_game(update: Update, context: ContextTypes.DEFAULT_TYPE):
     group_id = update.effective_chat.id
@@ -189,8 +219,36 @@ async def end_game(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # -------------------------
 # MAIN
 # -------------------------
+def setup_logging():
+    """Log through a queue so formatting and stdout writes happen off the event loop thread."""
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    # Attach the QueueHandler ourselves: basicConfig would give it a formatter too,
+    # and every record would then be formatted twice
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(QueueHandler(log_queue))
+    # httpx logs every request at INFO, which would drown out everything else
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    return listener
+
 def main():
-    app = ApplicationBuilder().token(BOT_KEY).build()
+    log_listener = setup_logging()
+
+    # Faster event loop for all the Telegram I/O; must be set before the application creates its loop
+    if uvloop:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+    app = (
+        ApplicationBuilder()
+        .token(BOT_KEY)
+        .concurrent_updates(GroupUpdateProcessor())
+        .build()
+    )
 
     # Test
     app.add_handler(CommandHandler("test", test_message))
@@ -210,8 +268,11 @@ def main():
     # Poll Handler
     app.add_handler(PollAnswerHandler(handle_poll_answer))
 
-    print("Bot is running...")
-    app.run_polling()
+    logger.info("Bot is running...")
+    try:
+        app.run_polling(timeout=POLLING_TIMEOUT, poll_interval=0.0)
+    finally:
+        log_listener.stop()
 
 
 if __name__ == "__main__":
@@ -4,10 +4,15 @@ from dotenv import load_dotenv
 load_dotenv()
 
 BOT_KEY = os.getenv("BOT_KEY")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 MAX_PLAYERS = 8
 ROUND_COUNT = 3
 
 # seconds
 RESPONSE_TIMEOUT = 30  
 LAST_REMINDER_TIME=10
-POLL_TIMING = 10
\ No newline at end of file
+POLL_TIMING = 10
+
+# Telegram long polling: getUpdates blocks server-side for up to this long
+# (python-telegram-bot adds it on top of the HTTP read timeout itself)
+POLLING_TIMEOUT = 20
\ No newline at end of file
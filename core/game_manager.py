@@ -1,14 +1,18 @@
 import asyncio
+import logging
 import random
 from config import RESPONSE_TIMEOUT, POLL_TIMING, LAST_REMINDER_TIME
 from models.Game import Game
 from core.telegram_client import TelegramClient
 from core.prompt_manager import PromptManager
 
+logger = logging.getLogger(__name__)
 
 class GameManager:
     def __init__(self):
         self.active_games = {}  # {group_id: Game}
+        self.user_to_game = {}  # {user_id: Game}
+        self.poll_to_game = {}  # {poll_id: Game}
 
     # -------------------------
     # Game lifecycle
@@ -24,36 +28,80 @@ class GameManager:
         return self.active_games.get(group_id)
 
     def stop_game(self, group_id):
-        if group_id in self.active_games:
-            del self.active_games[group_id]
+        game = self.active_games.pop(group_id, None)
+        if game is None:
+            return
+
+        # Stop the round timer / versus phase if one is still running
+        for handle in game.timer_handles:
+            handle.cancel()
+        for task in list(game.bg_tasks):
+            task.cancel()
+
+        # Purge reverse lookups that point at the stopped game
+        for user_id in game.players:
+            if self.user_to_game.get(user_id) is game:
+                del self.user_to_game[user_id]
+        for poll_id in game.poll_map:
+            self.poll_to_game.pop(poll_id, None)
+
+    def _spawn(self, game: Game, coro):
+        """Run coro in the background, keeping a strong ref on the game so it isn't garbage collected."""
+        task = asyncio.create_task(coro)
+        game.bg_tasks.add(task)
+        task.add_done_callback(game.bg_tasks.discard)
+        return task
 
     # -------------------------
     # Round management
     # -------------------------
-    async def _round_timer(self, game: Game, telegram_client: TelegramClient):
-        """Manages timer and sends time warnings during the round."""
+    async def _broadcast(self, telegram_client: TelegramClient, user_ids, text):
+        """DM the same text to every user concurrently; one failed DM doesn't stop the rest."""
+        await asyncio.gather(
+            *(telegram_client.send_message_to_person(user_id, text) for user_id in user_ids),
+            return_exceptions=True
+        )
+
+    def _players_still_answering(self, game: Game):
+        """User ids of players with at least one unanswered prompt."""
+        return [user_id for user_id, answers in game.pending_answers.items() if None in answers]
+
+    def _schedule_round_timer(self, game: Game, telegram_client: TelegramClient):
+        """Schedule the round's time warnings and its end on the event loop's timer queue."""
         half_elapsed = RESPONSE_TIMEOUT / 2
         warning_elapsed = max(0, RESPONSE_TIMEOUT - LAST_REMINDER_TIME)
 
-        # Half-time warning
-        await asyncio.sleep(half_elapsed)
-        for player in game.players.values():
-            await telegram_client.send_message_to_person(
-                player.user_id,
-                f"⏱ Half the time has passed! {int(RESPONSE_TIMEOUT - half_elapsed)} seconds left to submit your answers."
-            )
-
-        # 10-second warning
-        await asyncio.sleep(max(0, warning_elapsed - half_elapsed))
-        for player in game.players.values():
-            await telegram_client.send_message_to_person(
-                player.user_id,
-                f"⚠️ Only {int(RESPONSE_TIMEOUT - warning_elapsed)} seconds left! Quickly finish your prompts!"
-            )
-
-        # Wait for the last few seconds
-        await asyncio.sleep(max(0, RESPONSE_TIMEOUT - warning_elapsed))
+        # (seconds after round start, warning) — a None warning marks the end of the round
+        schedule = [
+            (half_elapsed,
+             f"⏱ Half the time has passed! {int(RESPONSE_TIMEOUT - half_elapsed)} seconds left to submit your answers."),
+            (warning_elapsed,
+             f"⚠️ Only {int(RESPONSE_TIMEOUT - warning_elapsed)} seconds left! Quickly finish your prompts!"),
+            (RESPONSE_TIMEOUT, None),
+        ]
+
+        # A round started mid-round (/next_round) replaces the old timer, so cancel it
+        # first; otherwise its handles become unreachable and stop_game can't cancel them.
+        for handle in game.timer_handles:
+            handle.cancel()
+
+        # All deadlines are fixed now, so slow broadcasts can't drift the timer and no
+        # task has to stay suspended for the whole round. stop_game cancels the handles.
+        loop = asyncio.get_running_loop()
+        game.timer_handles = [
+            loop.call_later(elapsed, self._on_round_timer, game, telegram_client, warning)
+            for elapsed, warning in schedule
+        ]
+
+    def _on_round_timer(self, game: Game, telegram_client: TelegramClient, warning):
+        """Timer callback: warn players who still have unanswered prompts, or end the round."""
+        if warning:
+            self._spawn(game, self._broadcast(telegram_client, self._players_still_answering(game), warning))
+        else:
+            self._spawn(game, self._end_round(game, telegram_client))
 
+    async def _end_round(self, game: Game, telegram_client: TelegramClient):
+        """Close answering and move on to the versus phase."""
         # Mark unanswered prompts
         for user_id, answers in game.pending_answers.items():
             for idx, ans in enumerate(answers):
@@ -63,6 +111,22 @@ class GameManager:
         # Move to versus phase
         await self.start_versus_phase(game, telegram_client)
 
+    async def _send_prompt(self, game: Game, telegram_client: TelegramClient, user_id, idx, text):
+        """
+        DM one prompt and map its message id to the prompt index as soon as it is sent.
+
+        Replies are handled concurrently, so a player may answer this prompt while other
+        prompt DMs are still in flight. A failed DM (e.g. the player blocked the bot) only
+        costs that prompt, not the whole round start.
+        """
+        try:
+            message = await telegram_client.send_message_to_person(user_id, text)
+        except Exception as e:
+            logger.warning("Could not DM round %s prompt to user %s: %s", game.round, user_id, e)
+            return
+        if idx is not None:
+            game.prompt_messages[user_id][message.message_id] = idx
+
     def _build_prompt_edges(self, user_ids, m):
         """
         Build a set of head-to-head matchups (edges).
@@ -85,202 +149,165 @@ class GameManager:
         if effective_m <= 0:
             return [], 0
 
-        edges = set()
-
         # Circulant graph construction:
         # connect each i to i+k for k=1..floor(effective_m/2).
-        for k in range(1, (effective_m // 2) + 1):
-            for i in range(n):
-                a = user_ids[i]
-                b = user_ids[(i + k) % n]
-                if a == b:
-                    continue
-                edges.add((a, b) if a < b else (b, a))
+        # effective_m <= n-1 keeps every k below n/2, so these edges are already distinct
+        # and never self-loops; no set or canonical ordering is needed.
+        edges = [
+            (user_ids[i], user_ids[(i + k) % n])
+            for k in range(1, (effective_m // 2) + 1)
+            for i in range(n)
+        ]
 
         # If degree is odd, add the "opposite" perfect matching (requires even n).
         if effective_m % 2 == 1 and n % 2 == 0:
             k = n // 2
-            for i in range(n // 2):
-                a = user_ids[i]
-                b = user_ids[i + k]
-                edges.add((a, b) if a < b else (b, a))
+            edges.extend((user_ids[i], user_ids[i + k]) for i in range(k))
 
-        edges_list = list(edges)
-        random.shuffle(edges_list)
-        return edges_list, effective_m
+        random.shuffle(edges)
+        return edges, effective_m
 
     async def start_round(
         self, game: Game, telegram_client: TelegramClient, prompt_manager: PromptManager, m=2
     ):
         """Start a new round and send prompts to all players."""
-        game.init_scores()
         game.round += 1
-        game.prompt_messages = {uid: {} for uid in game.players}
-        game.assigned_prompts = {uid: [] for uid in game.players}  # user_id -> list[(prompt_id, prompt_text)]
 
-        # Initialize poll tracking
+        # Initialize poll tracking (dropping any of last round's polls still in the index)
+        for poll_id in game.poll_map:
+            self.poll_to_game.pop(poll_id, None)
         game.votes = {}
         game.poll_map = {}
         game.completed_polls = set()
+        game.poll_complete = {}
 
-        user_ids = list(game.players.keys())
+        user_ids = [player.user_id for player in game.players_list]
         random.shuffle(user_ids)
 
         edges, effective_m = self._build_prompt_edges(user_ids, m)
-        game.pending_answers = {uid: [None] * effective_m for uid in game.players}
+
+        # Reset per-player round state in a single pass
+        game.prompt_messages, game.assigned_prompts, game.pending_answers = {}, {}, {}
+        for uid in user_ids:
+            game.prompt_messages[uid] = {}
+            game.assigned_prompts[uid] = []  # list[(prompt_id, prompt_text)]
+            game.pending_answers[uid] = [None] * effective_m
 
         # Each edge gets a prompt; both players on the edge receive it.
         prompt_texts = prompt_manager.get_random_prompts(len(edges))
         if not prompt_texts:
             prompt_texts = ["⚠️ No prompts available (check data/prompts.txt)."]
 
+        # The two endpoints of an edge are exactly the versus pair for its prompt,
+        # so record the pair (with each player's prompt index) as we assign it.
+        game.versus_pairs = []
         for edge_idx, (u, v) in enumerate(edges):
             prompt_id = f"r{game.round}_e{edge_idx}"
             prompt_text = prompt_texts[edge_idx % len(prompt_texts)]
+            idx_u = len(game.assigned_prompts[u])
+            idx_v = len(game.assigned_prompts[v])
             game.assigned_prompts[u].append((prompt_id, prompt_text))
             game.assigned_prompts[v].append((prompt_id, prompt_text))
-
-        for player in game.players.values():
-            # Send prompts individually
-            await telegram_client.send_message_to_person(
-                player.user_id,
-                f"🎬 Round {game.round} has begun! You have {RESPONSE_TIMEOUT} seconds to respond to all prompts."
-            )
-            for idx, (_, prompt_text) in enumerate(game.assigned_prompts.get(player.user_id, [])):
-                message = await telegram_client.send_message_to_person(
-                    player.user_id,
-                    f"Prompt {idx+1}:\n\n{prompt_text}\n\nPlease reply to this message with your answer."
-                )
-                game.prompt_messages[player.user_id][message.message_id] = idx
+            game.versus_pairs.append((prompt_text, u, idx_u, v, idx_v))
+
+        # Format the shared text once per round: the intro rides along with each player's first
+        # prompt (saving one DM per player) while every prompt stays its own reply target.
+        intro = f"🎬 Round {game.round} has begun! You have {RESPONSE_TIMEOUT} seconds to respond to all prompts."
+        headers = [f"{intro}\n\nPrompt 1:\n\n"] + [f"Prompt {idx+1}:\n\n" for idx in range(1, effective_m)]
+        footer = "\n\nPlease reply to this message with your answer."
+
+        # Fan out every prompt DM at once; each prompt body is built once and shared by both players
+        sends = []
+        for prompt_text, u, idx_u, v, idx_v in game.versus_pairs:
+            body = prompt_text + footer
+            sends.append(self._send_prompt(game, telegram_client, u, idx_u, headers[idx_u] + body))
+            sends.append(self._send_prompt(game, telegram_client, v, idx_v, headers[idx_v] + body))
+        if not sends:
+            sends = [self._send_prompt(game, telegram_client, uid, None, intro) for uid in user_ids]
+        await asyncio.gather(*sends)
 
         # Start the timer (includes half-time and 10s warnings)
-        asyncio.create_task(self._round_timer(game, telegram_client))
-
-    # -------------------------
-    # Pairing & polling
-    # -------------------------
-    def build_versus_pairs(self, game: Game):
-        """
-        Build versus pairs by matching players that received the same prompt instance.
-
-        Prompts can be reused across edges (e.g., if the prompt pool is small), so we
-        match using a per-round prompt_id rather than just prompt text.
-        """
-        prompt_map = {}  # prompt_id -> {"text": prompt_text, "entries": list[(user_id, prompt_idx)]}
-
-        for user_id, prompts in game.assigned_prompts.items():
-            for idx, prompt_item in enumerate(prompts):
-                prompt_id, prompt_text = prompt_item
-                if not prompt_id:
-                    continue
-                prompt_map.setdefault(prompt_id, {"text": prompt_text, "entries": []})["entries"].append((user_id, idx))
-
-        pairs = []
-        for prompt in prompt_map.values():
-            prompt_text = prompt["text"]
-            entries = prompt["entries"]
-            if len(entries) < 2:
-                continue
-
-            # deterministic ordering
-            entries.sort(key=lambda x: x[0])
-
-            # Pair sequentially: (0,1), (2,3), ...
-            for i in range(0, len(entries) - 1, 2):
-                (p1_id, idx1) = entries[i]
-                (p2_id, idx2) = entries[i + 1]
-                pairs.append((prompt_text, p1_id, idx1, p2_id, idx2))
-
-        game.versus_pairs = pairs
-
-    async def conduct_versus_poll(self, game: Game, telegram_client: TelegramClient, group_id):
-        """(Unused separately) Create polls for versus pairs."""
-        for prompt_text, p1_id, idx1, p2_id, idx2 in game.versus_pairs:
-            p1_answer = game.pending_answers[p1_id][idx1]
-            p2_answer = game.pending_answers[p2_id][idx2]
-
-            question = f"{prompt_text}\n\nVote for the better answer:"
-            options = [
-                f"{game.players[p1_id].username}: {p1_answer}",
-                f"{game.players[p2_id].username}: {p2_answer}",
-            ]
-
-            poll_message = await telegram_client.send_poll(group_id, question, options)
-
-            # Track poll by poll_id (not message_id)
-            poll_id = poll_message.poll.id
-            game.votes[poll_id] = {}
-            game.poll_map[poll_id] = (p1_id, p2_id)
+        self._schedule_round_timer(game, telegram_client)
 
     # -------------------------
     # Scoring
     # -------------------------
     async def calculate_poll_score(self, game: Game, poll_id):
         """Compute and assign points after a poll finishes."""
-        if poll_id not in game.poll_map:
+        # Each poll is scored exactly once, however many times completion is reported
+        if poll_id not in game.poll_map or poll_id in game.completed_polls:
             return
+        game.completed_polls.add(poll_id)
 
-        p1_id, p2_id = game.poll_map[poll_id]
-        votes = game.votes.get(poll_id, {})
-        print(f"Votes for poll {poll_id}:", votes)
-        total_votes = len(votes)
-
-        game.scores.setdefault(p1_id, 0.0)
-        game.scores.setdefault(p2_id, 0.0)
+        p1_idx, p2_idx = game.poll_map[poll_id]
+        votes = game.votes[poll_id]
+        logger.debug("Votes for poll %s: %s", poll_id, votes)
+        choices = tuple(votes.values())
+        total_votes = len(choices)
 
+        # Scores are kept as integer tenths of a point; a poll is worth 100 points (1000 tenths)
         if total_votes == 0:
-            game.scores[p1_id] += 50.0
-            game.scores[p2_id] += 50.0
+            game.scores[p1_idx] += 500
+            game.scores[p2_idx] += 500
         else:
-            p1_votes = sum(1 for v in votes.values() if v == 0)
-            p2_votes = total_votes - p1_votes
-
-            p1_points = 100.0 * (p1_votes / total_votes)
-            p2_points = 100.0 * (p2_votes / total_votes)
-
-            game.scores[p1_id] += p1_points
-            game.scores[p2_id] += p2_points
+            p1_votes = choices.count(0)
 
-        game.completed_polls.add(poll_id)
+            # Round p1's share and give p2 the rest, so every poll hands out exactly 1000
+            p1_points = (1000 * p1_votes + total_votes // 2) // total_votes
+            game.scores[p1_idx] += p1_points
+            game.scores[p2_idx] += 1000 - p1_points
 
     async def send_scoreboard(self, game: Game, telegram_client: TelegramClient, group_id):
         """Send the current scoreboard to the group."""
-        scoreboard = "🏆 Current Scores:\n"
-        sorted_players = sorted(game.scores.items(), key=lambda x: x[1], reverse=True)
-        for uid, score in sorted_players:
-            scoreboard += f"{game.players[uid].username}: {round(score, 1)}\n"
+        scores = game.scores
+        players = game.players_list
+        ranking = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+        scoreboard = "\n".join(
+            ["🏆 Current Scores:"] + [f"{players[i].username}: {scores[i] / 10:.1f}" for i in ranking]
+        )
         await telegram_client.send_message_to_group(group_id, scoreboard)
 
     # -------------------------
     # Versus phase
     # -------------------------
+    async def _create_poll(self, game: Game, telegram_client: TelegramClient, pair):
+        """Post one versus poll to the group and start tracking its votes."""
+        prompt_text, p1_id, idx1, p2_id, idx2 = pair
+        p1_answer = game.pending_answers[p1_id][idx1]
+        p2_answer = game.pending_answers[p2_id][idx2]
+
+        question = f"{prompt_text}\n\nVote for the better answer!"
+        options = [
+            f"{game.usernames[p1_id]}: {p1_answer}",
+            f"{game.usernames[p2_id]}: {p2_answer}",
+        ]
+
+        poll_message = await telegram_client.send_poll(game.group_id, question, options)
+
+        poll_id = poll_message.poll.id
+        game.votes[poll_id] = {}
+        game.poll_map[poll_id] = (game.players[p1_id].idx, game.players[p2_id].idx)
+        game.poll_complete[poll_id] = asyncio.Event()
+        self.poll_to_game[poll_id] = game
+        return poll_id
+
+    async def _run_poll(self, game: Game, telegram_client: TelegramClient, pair):
+        """Post one versus poll, wait until everyone voted or its window closes, then score it."""
+        poll_id = await self._create_poll(game, telegram_client, pair)
+        try:
+            await asyncio.wait_for(game.poll_complete[poll_id].wait(), timeout=POLL_TIMING)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            # Late votes on a closed poll are ignored, and finished games don't linger in the index
+            self.poll_to_game.pop(poll_id, None)
+        await self.calculate_poll_score(game, poll_id)
+
     async def start_versus_phase(self, game: Game, telegram_client: TelegramClient):
         """Run the versus voting phase with polls."""
         group_id = game.group_id
-        self.build_versus_pairs(game)
-
-        for prompt_text, p1_id, idx1, p2_id, idx2 in game.versus_pairs:
-            p1_answer = game.pending_answers[p1_id][idx1]
-            p2_answer = game.pending_answers[p2_id][idx2]
-
-            question = f"{prompt_text}\n\nVote for the better answer!"
-            options = [
-                f"{game.players[p1_id].username}: {p1_answer}",
-                f"{game.players[p2_id].username}: {p2_answer}",
-            ]
-
-            poll_message = await telegram_client.send_poll(group_id, question, options)
-
-            poll_id = poll_message.poll.id
-            game.votes[poll_id] = {}
-            game.poll_map[poll_id] = (p1_id, p2_id)
-
-            start_time = asyncio.get_event_loop().time()
-            while len(game.votes[poll_id]) < len(game.players):
-                if asyncio.get_event_loop().time() - start_time > POLL_TIMING:
-                    break
-                await asyncio.sleep(1)
 
-            # await self.calculate_poll_score(game, poll_id)
+        # All polls run side by side (the client's rate limiter keeps us under Telegram's limits)
+        await asyncio.gather(*(self._run_poll(game, telegram_client, pair) for pair in game.versus_pairs))
 
         await self.send_scoreboard(game, telegram_client, group_id)
@@ -2,12 +2,25 @@ import random
 
 class PromptManager:
     def __init__(self, path="data/prompts.txt"):
-        # open the file and read all non-empty lines
+        # open the file once and keep all non-empty lines in memory
         with open(path, "r", encoding="utf-8") as f:
-            self.prompts = [line.strip() for line in f if line.strip()]
+            self.prompts = tuple(line.strip() for line in f if line.strip())
+        self._n = len(self.prompts)
+        self._rng = random.Random()
+
+        # deal prompts from a shuffled deck; reshuffle only once it runs out
+        self._deck = list(self.prompts)
+        self._rng.shuffle(self._deck)
+        self._ptr = 0
 
     def get_random_prompts(self, count):
-        # safely sample prompts
-        if count > len(self.prompts):
-            count = len(self.prompts)
-        return random.sample(self.prompts, count)
\ No newline at end of file
+        # only fall back to repeats if the pool is too small
+        if count > self._n:
+            return self._rng.choices(self.prompts, k=count) if self.prompts else []
+
+        if self._ptr + count > self._n:
+            self._rng.shuffle(self._deck)
+            self._ptr = 0
+        prompts = self._deck[self._ptr:self._ptr + count]
+        self._ptr += count
+        return prompts
@@ -1,12 +1,26 @@
 import asyncio
-from telegram import Bot, InputFile
+from telegram import InputFile
+from telegram.ext import AIORateLimiter, ExtBot
+from telegram.request import HTTPXRequest
+
+# Stay a little under Telegram's ~30 messages/second bot-wide limit
+MAX_MESSAGES_PER_SECOND = 25
+# Persistent keep-alive connections shared by all concurrent sends
+CONNECTION_POOL_SIZE = 256
 
 class TelegramClient:
     def __init__(self, token):
-        self.bot = Bot(token=token)
+        self.bot = ExtBot(
+            token=token,
+            request=HTTPXRequest(connection_pool_size=CONNECTION_POOL_SIZE),
+            rate_limiter=AIORateLimiter(overall_max_rate=MAX_MESSAGES_PER_SECOND),
+        )
+        self._bg_tasks = set()  # strong refs to pending self-delete tasks
+        self._gif_file_id_cache = {}  # {gif_path: Telegram file_id}, so each GIF is only uploaded once
 
-    async def send_message_to_person(self, chat_id, text, **kwargs):
-        return await self.bot.send_message(chat_id=chat_id, text=text, **kwargs)
+    async def send_message_to_person(self, chat_id, text):
+        # Hot path (every prompt and warning DM): plain text only, no kwargs forwarding
+        return await self.bot.send_message(chat_id, text)
 
     async def send_message_to_group(self, chat_id, text, **kwargs):
         return await self.bot.send_message(chat_id=chat_id, text=text, **kwargs)
@@ -16,13 +30,22 @@ class TelegramClient:
     
     async def send_gif_to_person(self, chat_id, gif_path, caption=None, ttl=None, **kwargs):
         """Send a GIF to a user in private chat with optional self-delete after ttl seconds."""
-        with open(gif_path, "rb") as f:
-            gif_file = InputFile(f, filename="animation.gif")
-            message = await self.bot.send_animation(chat_id=chat_id, animation=gif_file, caption=caption, **kwargs)
+        cached_file_id = self._gif_file_id_cache.get(gif_path)
+        if cached_file_id:
+            # Already on Telegram's servers; resend by file_id without uploading
+            message = await self.bot.send_animation(chat_id=chat_id, animation=cached_file_id, caption=caption, **kwargs)
+        else:
+            with open(gif_path, "rb") as f:
+                gif_file = InputFile(f, filename="animation.gif")
+                message = await self.bot.send_animation(chat_id=chat_id, animation=gif_file, caption=caption, **kwargs)
+            if message.animation:
+                self._gif_file_id_cache[gif_path] = message.animation.file_id
 
         # Schedule deletion if ttl is provided
         if ttl is not None:
-            asyncio.create_task(self._delete_message_after(chat_id, message.message_id, ttl))
+            task = asyncio.create_task(self._delete_message_after(chat_id, message.message_id, ttl))
+            self._bg_tasks.add(task)
+            task.add_done_callback(self._bg_tasks.discard)
 
         return message
 
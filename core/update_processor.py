@@ -0,0 +1,40 @@
+import asyncio
+from collections import defaultdict
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+class GroupUpdateProcessor(BaseUpdateProcessor):
+    """
+    Process updates concurrently, but one at a time per chat.
+
+    A slow handler in one lobby no longer stalls every other group, while updates
+    from the same chat still run in the order they arrived.
+    """
+
+    def __init__(self, max_concurrent_updates=256):
+        super().__init__(max_concurrent_updates)
+        self._chat_locks = defaultdict(lambda: [asyncio.Lock(), 0])  # {chat_id: [asyncio.Lock, pending_count]}
+
+    async def do_process_update(self, update, coroutine):
+        chat = update.effective_chat if isinstance(update, Update) else None
+        if chat is None:
+            # e.g. poll answers carry no chat; nothing to serialize against
+            await coroutine
+            return
+
+        entry = self._chat_locks[chat.id]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                await coroutine
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._chat_locks[chat.id]
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
@@ -2,29 +2,38 @@ class Game:
     def __init__(self, group_id):
         self.group_id = group_id
         self.players = {}
+        self._players_list = []       # join order; kept in step with players
+        self.usernames = {}           # {user_id: username}, filled as players join
         self.round = 0
         
         self.prompts = []
         self.locked = False
         self.pending_answers = {} # { user_id: None } initially none for each player
         
-        self.versus_pairs = []        # [(prompt, player1_id, player2_id)]
-        self.scores = {}
+        self.versus_pairs = []        # [(prompt_text, player1_id, prompt_idx1, player2_id, prompt_idx2)]
+        self.scores = []              # [int] in tenths of a point, indexed by Player.idx
         self.votes = {}               # {poll_message_id: {voter_id: choice_index}}
 
         self.prompt_messages = {uid: {} for uid in self.players}
-        self.poll_map = {}
+        self.poll_map = {}            # {poll_id: (player1_idx, player2_idx)}
         self.assigned_prompts = {}
 
         self.completed_polls = set()
+        self.poll_complete = {}       # {poll_id: asyncio.Event} set once every player has voted
+        self.bg_tasks = set()         # strong refs to running background tasks (warnings, versus phase)
+        self.timer_handles = []       # asyncio.TimerHandle for the current round's warnings and end
 
     def add_player(self, player):
+        player.idx = len(self._players_list)
         self.players[player.user_id] = player
+        self._players_list.append(player)
+        self.scores.append(0)
+        self.usernames[player.user_id] = player.username
 
-    def init_scores(self):
-        for uid in self.players.keys():
-            if uid not in self.scores:
-                self.scores[uid] = 0.0
+    @property
+    def players_list(self):
+        """Players in join order, without rebuilding a list on every call (don't mutate it)."""
+        return self._players_list
 
     def is_full(self, max_players):
         return len(self.players) >= max_players
@@ -33,5 +42,5 @@ class Game:
         self.round = 0
         self.prompts = []
         self.versus_pairs = []
-        self.scores = {}
+        self.scores = [0] * len(self._players_list)
         self.locked = False
\ No newline at end of file
@@ -2,6 +2,7 @@ class Player:
     def __init__(self, user_id, username):
         self.user_id = user_id
         self.username = username
+        self.idx = None    # dense position in the game's per-player lists, set on join
         self.answers = {}  # {round_num: answer_text}
         self.score = 0
 